@@ -1,8 +1,15 @@
-from web_framework.web_framework import App, Request, Response
+from web_framework.web_framework import App, Request, Response, json_dumps
 from web_server.async_web_server import AsyncHTTPServer
 import asyncio
 import logging
 
+# uvloop is optional: when it is installed the server runs on its libuv-backed
+# event loop, otherwise we fall back to the stdlib asyncio loop
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 
 # setup logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -16,9 +23,25 @@ users_db = {
     "1": {"id": "1", "name": "mayur", "email": "mayur@example.com"},
     "2": {"id": "2", "name": "admin", "email": "admin@example.com"}
 }
+# serialized JSON and lowercased name of every user, kept in sync with users_db on every write
+users_json_cache = {user_id: json_dumps(user) for user_id, user in users_db.items()}
+users_lower_name = {user_id: user['name'].lower() for user_id, user in users_db.items()}
+
+# responses that never change, built once and shared by every handler
+NOT_FOUND = Response({"detail": "user not found"}, status_code=404, reason_phrase="Not Found", content_type="application/json")
+BAD_JSON = Response({"detail": "invalid JSON body"}, status_code=400, reason_phrase="Bad Request", content_type="application/json")
+USER_DELETED = Response(status_code=204, reason_phrase="No Content")
+
+def sync_user_caches(user_id: str) -> None:
+    """refreshes the cached JSON and lowercased name of a user after it changed."""
+    user = users_db[user_id]
+    users_json_cache[user_id] = json_dumps(user)
+    # only real string names are searchable, a null or numeric name matches nothing
+    name = user.get('name')
+    users_lower_name[user_id] = name.lower() if isinstance(name, str) else ''
 
 # define API endpoints
-@app.get("/")
+@app.get("/", cache=True)
 async def read_root(request: Request) -> Response:
     """handles GET requests to the root path."""
     return Response({"message": "welcome to the simple REST API!"}, content_type="application/json")
@@ -32,9 +55,10 @@ async def get_users(request: Request) -> Response:
     """
     name_filter = request.query_params.get('name')
     if name_filter:
-        filtered_users = [user for user in users_db.values() if name_filter[0].lower() in user['name'].lower()]
-        return Response(filtered_users, content_type="application/json")
-    return Response(list(users_db.values()), content_type="application/json")
+        needle = name_filter[0].lower()
+        filtered_users = [users_json_cache[user_id] for user_id, lower_name in users_lower_name.items() if needle in lower_name]
+        return Response(b"[" + b",".join(filtered_users) + b"]", content_type="application/json")
+    return Response(b"[" + b",".join(users_json_cache.values()) + b"]", content_type="application/json")
 
 @app.get("/users/{user_id}")
 async def get_user_by_id(request: Request) -> Response:
@@ -44,10 +68,10 @@ async def get_user_by_id(request: Request) -> Response:
     example: /users/1
     """
     user_id = request.path_params.get('user_id')
-    user = users_db.get(user_id)
-    if user:
-        return Response(user, content_type="application/json")
-    return Response({"detail": "user not found"}, status_code=404, reason_phrase="Not Found", content_type="application/json")
+    user_json = users_json_cache.get(user_id)
+    if user_json:
+        return Response(user_json, content_type="application/json")
+    return NOT_FOUND
 
 @app.post("/users")
 async def create_user(request: Request) -> Response:
@@ -62,8 +86,9 @@ async def create_user(request: Request) -> Response:
         new_id = str(len(users_db) + 1)
         new_user = {"id": new_id, **new_user_data}
         users_db[new_id] = new_user
+        sync_user_caches(new_id)
         return Response(new_user, status_code=201, content_type="application/json")
-    return Response({"detail": "invalid JSON body"}, status_code=400, reason_phrase="Bad Request", content_type="application/json")
+    return BAD_JSON
 
 @app.put("/users/{user_id}")
 async def update_user(request: Request) -> Response:
@@ -74,14 +99,15 @@ async def update_user(request: Request) -> Response:
     """
     user_id = request.path_params.get('user_id')
     if user_id not in users_db:
-        return Response({"detail": "user not found"}, status_code=404, reason_phrase="Not Found", content_type="application/json")
+        return NOT_FOUND
 
     if request.json:
         updated_data = request.json
         # in a real app, you would validate the data
         users_db[user_id].update(updated_data)
+        sync_user_caches(user_id)
         return Response(users_db[user_id], content_type="application/json")
-    return Response({"detail": "Invalid JSON body"}, status_code=400, reason_phrase="Bad Request", content_type="application/json")
+    return BAD_JSON
 
 @app.patch("/users/{user_id}")
 async def partial_update_user(request: Request) -> Response:
@@ -92,7 +118,7 @@ async def partial_update_user(request: Request) -> Response:
     """
     user_id = request.path_params.get('user_id')
     if user_id not in users_db:
-        return Response({"detail": "User not found"}, status_code=404, reason_phrase="Not Found", content_type="application/json")
+        return NOT_FOUND
 
     if request.json:
         patch_data = request.json
@@ -100,8 +126,9 @@ async def partial_update_user(request: Request) -> Response:
         for key, value in patch_data.items():
             if key in users_db[user_id]:
                 users_db[user_id][key] = value
+        sync_user_caches(user_id)
         return Response(users_db[user_id], content_type="application/json")
-    return Response({"detail": "invalid JSON body"}, status_code=400, reason_phrase="Bad Request", content_type="application/json")
+    return BAD_JSON
 
 @app.delete("/users/{user_id}")
 async def delete_user(request: Request) -> Response:
@@ -112,8 +139,10 @@ async def delete_user(request: Request) -> Response:
     user_id = request.path_params.get('user_id')
     if user_id in users_db:
         del users_db[user_id]
-        return Response({"message": "user deleted successfully"}, status_code=204, content_type="application/json")
-    return Response({"detail": "user not found"}, status_code=404, reason_phrase="Not Found", content_type="application/json")
+        del users_json_cache[user_id]
+        del users_lower_name[user_id]
+        return USER_DELETED
+    return NOT_FOUND
 
 # main
 async def main() -> None:
@@ -123,6 +152,9 @@ async def main() -> None:
 if __name__ == "__main__":
     app_logger.info("starting the application...") 
     try:
-        asyncio.run(main())
+        if uvloop is not None:
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         app_logger.warning("\nserver shutting down.")
\ No newline at end of file
@@ -1,16 +1,33 @@
 import json
 import re
+import sys
 from urllib.parse import parse_qs
-from typing import Dict, Any, List, Tuple, Callable, Awaitable, Optional, Union
+from typing import Dict, Any, List, Set, Tuple, Callable, Awaitable, Optional, Union
 import logging
 
 framework_logger = logging.getLogger(__name__)
 
+# orjson is optional: it parses from and serializes to bytes directly,
+# otherwise fall back to the stdlib json module
+try:
+    import orjson
+
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    def json_loads(data: bytes) -> Any:
+        return json.loads(data.decode('utf-8'))
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
 class Request:
     """
     represents an incoming HTTP request. parses method, path, headers,
     query parameters, path parameters, and body.
     """
+    __slots__ = ('path', 'method', 'headers', 'query_params', 'body', 'path_params', 'json')
+
     def __init__(self, scope: Dict[str, Any]):
         self.path: str = scope['path']
         self.method: str = scope['method']
@@ -22,18 +39,23 @@ class Request:
 
         if 'content-type' in self.headers and 'application/json' in self.headers['content-type']:
             try:
-                self.json = json.loads(self.body.decode('utf-8'))
-            except json.JSONDecodeError:
+                self.json = json_loads(self.body)
+            except (json.JSONDecodeError, UnicodeDecodeError):
                 framework_logger.warning("Invalid JSON body received.")
                 self.json = None
 
     def __repr__(self):
         return f"<Request method={self.method} path={self.path}>"
 
+# encoded Content-Length values for small bodies, which covers most API responses
+_CONTENT_LENGTH_CACHE: List[bytes] = [str(length).encode() for length in range(4096)]
+
 class Response:
     """
     represents an outgoing HTTP response.
     """
+    __slots__ = ('body', 'status_code', 'reason_phrase', 'headers', 'content_type')
+
     def __init__(self, body: bytes ="", status_code: int = 200, reason_phrase: str = "OK", headers: Dict[str, Any] = None, content_type: str = "application/json"):
         self.body: bytes = body
         self.status_code: int = status_code
@@ -41,20 +63,27 @@ class Response:
         self.headers: Dict[str, Any] = headers if headers is not None else {}
         self.content_type: str = content_type
 
-        # Set Content-Type header if not already present
-        if 'content-type' not in {k.lower() for k in self.headers.keys()}:
-            self.headers['Content-Type'] = self.content_type
+        # Set Content-Type header if not already present, the common case of no
+        # caller headers is answered without scanning them
+        if not self.headers or not any(k.lower() == 'content-type' for k in self.headers):
+            self.headers['Content-Type'] = self.content_type.encode()
 
         # Ensure content is bytes
         if isinstance(self.body, str):
             self.body = self.body.encode('utf-8')
         elif isinstance(self.body, (dict, list)):
-            self.body = json.dumps(self.body).encode('utf-8')
-            self.headers['Content-Type'] = 'application/json'
+            self.body = json_dumps(self.body)
+            self.headers['Content-Type'] = b'application/json'
         else:
             self.body = self.body
 
-        self.headers['Content-Length'] = str(len(self.body))
+        # a 204 response carries no body and must not send Content-Length, otherwise
+        # a kept-alive client would read the body as the start of the next response
+        if self.status_code == 204:
+            self.body = b''
+            return
+        length = len(self.body)
+        self.headers['Content-Length'] = _CONTENT_LENGTH_CACHE[length] if length < 4096 else str(length).encode()
 
     def __repr__(self):
         return f"<Response status={self.status_code} content_type={self.content_type}>"
@@ -63,25 +92,79 @@ class Response:
 # a handler takes a Request and returns an Awaitable Response
 Handler = Callable[[Request], Awaitable[Response]]
 
+# shared response for requests that match no route
+NOT_FOUND_RESPONSE = Response(status_code=404, reason_phrase="Not Found")
+
+# matches a path parameter placeholder such as {user_id}
+PATH_PARAM_PATTERN = re.compile(r'\{([a-zA-Z_][a-zA-Z0-9_]*)\}')
+
 class Router:
     """
     handles routing requests to the appropriate handler functions based on
     HTTP method and path. Supports path parameters.
     """
     def __init__(self) -> None:
-        self.routes: Dict[str, List[Tuple[re.Pattern[str], Handler]]] = {}
+        # routes with path parameters as registered, in registration order
+        self.routes: Dict[str, List[Tuple[str, Handler]]] = {}
+        # per method, all parametric routes combined into one regex, plus the
+        # handler and (group name, param name) pairs keyed by each route's outer
+        # group name. only _compile_dispatch reads the handler table, to generate
+        # one branch per route
+        self.combined_routes: Dict[str, Tuple[re.Pattern[str], Dict[str, Tuple[Handler, Tuple[Tuple[str, str], ...]]]]] = {}
+        # routes without path parameters, matched with a single dict lookup
+        self.static_routes: Dict[Tuple[str, str], Handler] = {}
+        # static routes whose handler output is constant, and their stored responses
+        self.cached_routes: Set[Tuple[str, str]] = set()
+        self.response_cache: Dict[Tuple[str, str], Response] = {}
 
-    def _add_route(self, method: str, path: str, handler: Handler) -> None:
+    def _add_route(self, method: str, path: str, handler: Handler, cache: bool = False) -> None:
         """adds a route for a specific HTTP method."""
-        # convert path to a regex pattern to capture path parameters
-        # e.g., /users/{user_id} -> /users/(?P<user_id>[^/]+)
-        pattern = re.sub(r'\{([a-zA-Z_][a-zA-Z0-9_]*)\}', r'(?P<\1>[^/]+)', path)
-        self.routes.setdefault(method, []).append((re.compile(f"^{pattern}$"), handler))
+        method = sys.intern(method)
+        # drop a previously compiled dispatch so the new route gets compiled in
+        self.__dict__.pop('dispatch', None)
+        if '{' not in path:
+            self.static_routes[(method, path)] = handler
+            if cache:
+                self.cached_routes.add((method, path))
+            framework_logger.debug(f"Added route: {method} {path}")
+            return
+        if cache:
+            raise ValueError(f"only routes without path parameters can be cached: {path}")
+        self.routes.setdefault(method, []).append((path, handler))
+        self._combine_routes(method)
         framework_logger.debug(f"Added route: {method} {path}")
 
-    def get(self, path: str) -> Callable[[Handler], Handler]:
+    def _combine_routes(self, method: str) -> None:
+        """
+        rebuilds the combined regex for a method so dispatch needs a single match.
+        each route becomes a named alternative, e.g. /users/{user_id} ->
+        (?P<r0>/users/(?P<r0_user_id>[^/]+)). the generated dispatch uses the group
+        indices of these names: match.lastindex is the outer group of the route hit,
+        and each param is read with match.group(index).
+        """
+        alternatives: List[str] = []
+        handlers: Dict[str, Tuple[Handler, Tuple[Tuple[str, str], ...]]] = {}
+        for index, (path, handler) in enumerate(self.routes[method]):
+            route_group = f"r{index}"
+            params: List[Tuple[str, str]] = []
+
+            def param_group(match: re.Match[str]) -> str:
+                group = f"{route_group}_{match.group(1)}"
+                params.append((group, match.group(1)))
+                return f"(?P<{group}>[^/]+)"
+
+            alternatives.append(f"(?P<{route_group}>{PATH_PARAM_PATTERN.sub(param_group, path)})")
+            handlers[route_group] = (handler, tuple(params))
+        pattern = re.compile(f"^(?:{'|'.join(alternatives)})$")
+        self.combined_routes[method] = (pattern, handlers)
+
+    def get(self, path: str, cache: bool = False) -> Callable[[Handler], Handler]:
+        """
+        registers a GET handler. with cache=True the handler is called once and
+        its response is reused for every later request to the same path.
+        """
         def decorator(handler):
-            self._add_route('GET', path, handler)
+            self._add_route('GET', path, handler, cache)
             return handler
         return decorator
 
@@ -113,14 +196,67 @@ class Router:
         """
         dispatches the request to the matching handler.
         Sets request.path_params if path parameters are found.
+        on first use the routing table is compiled into a specialized dispatch
+        function, which is bound over this method for every later request.
         """
-        if request.method in self.routes:
-            for pattern, handler in self.routes[request.method]:
-                match = pattern.match(request.path)
-                if match:
-                    request.path_params = match.groupdict()
-                    return await handler(request)
-        return Response(status_code=404, reason_phrase="Not Found")
+        self.dispatch = self._compile_dispatch()
+        return await self.dispatch(request)
+
+    def _compile_dispatch(self) -> Handler:
+        """
+        generates the source of a dispatch function with the registered routes
+        inlined as if-chains on method and path, and compiles it with exec.
+        """
+        namespace: Dict[str, Any] = {'not_found': NOT_FOUND_RESPONSE, 'response_cache': self.response_cache}
+        lines: List[str] = [
+            "async def dispatch(request):",
+            "    method = request.method",
+            "    path = request.path",
+        ]
+        methods = list(dict.fromkeys([method for method, _ in self.static_routes] + list(self.combined_routes)))
+        for method_index, method in enumerate(methods):
+            lines.append(f"    {'if' if method_index == 0 else 'elif'} method == {method!r}:")
+            for route_index, ((route_method, path), handler) in enumerate(self.static_routes.items()):
+                if route_method != method:
+                    continue
+                namespace[f"handler_{route_index}"] = handler
+                lines.append(f"        if path == {path!r}:")
+                if (route_method, path) in self.cached_routes:
+                    namespace[f"key_{route_index}"] = (route_method, path)
+                    lines += [
+                        f"            response = response_cache.get(key_{route_index})",
+                        "            if response is None:",
+                        f"                response = await handler_{route_index}(request)",
+                        f"                response_cache[key_{route_index}] = response",
+                        "            return response",
+                    ]
+                else:
+                    lines.append(f"            return await handler_{route_index}(request)")
+            if method in self.combined_routes:
+                pattern, handlers = self.combined_routes[method]
+                namespace[f"match_{method_index}"] = pattern.match
+                lines += [
+                    f"        match = match_{method_index}(path)",
+                    "        if match:",
+                    "            route = match.lastindex",
+                ]
+                # the route's outer group closes last, so lastindex identifies the route;
+                # params are read by their precomputed group index instead of groupdict()
+                for route_group, (handler, params) in handlers.items():
+                    handler_name = f"handler_{method_index}_{route_group}"
+                    namespace[handler_name] = handler
+                    path_params = ", ".join(f"{name!r}: match.group({pattern.groupindex[group]})" for group, name in params)
+                    lines += [
+                        f"            if route == {pattern.groupindex[route_group]}:",
+                        f"                request.path_params = {{{path_params}}}",
+                        f"                return await {handler_name}(request)",
+                    ]
+        lines.append("    return not_found")
+
+        source = "\n".join(lines)
+        framework_logger.debug(f"compiled dispatch:\n{source}")
+        exec(source, namespace)
+        return namespace['dispatch']
 
 class App:
     """
@@ -131,7 +267,7 @@ class App:
         self.router = Router()
 
     # expose router methods directly on the app for convenience
-    def get(self, path) -> Callable[[Handler], Handler]: return self.router.get(path)
+    def get(self, path, cache=False) -> Callable[[Handler], Handler]: return self.router.get(path, cache)
     def post(self, path) -> Callable[[Handler], Handler]: return self.router.post(path)
     def put(self, path) -> Callable[[Handler], Handler]: return self.router.put(path)
     def patch(self, path) -> Callable[[Handler], Handler]: return self.router.patch(path)
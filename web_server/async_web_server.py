@@ -1,19 +1,28 @@
 import asyncio
 import logging
-from urllib.parse import urlparse
-from typing import Dict, Any, List, Tuple, Callable
+import sys
+from typing import Dict, Any, Tuple, Callable
 
 server_logger = logging.getLogger(__name__)
 
+# lookup table mapping ASCII A-Z to a-z, used to lowercase header names with bytes.translate
+_LOWERCASE_TABLE: bytes = bytes.maketrans(bytes(range(0x41, 0x5B)), bytes(range(0x61, 0x7B)))
+
+# interned method names, so the router's dict lookups hit on identity instead of comparing strings
+_METHODS: Dict[str, str] = {method: sys.intern(method) for method in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')}
+
 
 class AsyncHTTPServer:
     MAX_BODY_SIZE:int = 1024 * 1024 # 1 MB
+    KEEP_ALIVE_TIMEOUT:float = 5.0 # seconds a connection may take to send its next request
 
-    def __init__(self, app: Callable[[Dict[str, Any]], Dict[str, Any]], host: str = '127.0.0.1', port:int = 8080):
+    def __init__(self, app: Callable[[Dict[str, Any]], Dict[str, Any]], host: str = '127.0.0.1', port:int = 8080, max_concurrency: int = None):
         self.app = app
         self.host = host
         self.port = port
         self.server: asyncio.Server = None
+        # optional limit on how many requests run inside the app at once
+        self.app_semaphore: asyncio.Semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
     
     async def listen_serve(self) -> None:
         self.server = await asyncio.start_server(self.__handle_request, self.host, self.port)
@@ -26,20 +35,74 @@ class AsyncHTTPServer:
         addr: Tuple[str, str] = writer.get_extra_info("peername")
         server_logger.info(f"client {addr} connected")
 
+        loop = asyncio.get_running_loop()
         http_handler = HttpHandler(reader, writer)
-        asgi_scope: Dict[str, Any] = await http_handler.parse_http_request(self.MAX_BODY_SIZE)
-        if not asgi_scope:
-            return
-        server_logger.debug(f"asgi scope: {asgi_scope}") 
-        # send scope to app and get response
+        idle_timer: asyncio.TimerHandle = None
         try:
-            response: Dict[str, Any] = await self.app(asgi_scope)
-            server_logger.debug(f"web server response {response}")
-            await http_handler.send_http_response(**response)
-        except Exception as e:
-            server_logger.error(e)
-            await http_handler.send_http_response(status_code=500, reason_phrase="Something went wrong!")
-        
+            # serve requests on the same connection until the client closes it or asks us to
+            while not reader.at_eof():
+                # a single timer per request instead of a timeout on every read: if the
+                # request has not fully arrived in time the connection is aborted
+                idle_timer = loop.call_later(self.KEEP_ALIVE_TIMEOUT, writer.transport.abort)
+                asgi_scope: Dict[str, Any] = await http_handler.parse_http_request(self.MAX_BODY_SIZE)
+                idle_timer.cancel()
+                if not asgi_scope:
+                    break
+                server_logger.debug(f"asgi scope: {asgi_scope}") 
+                keep_alive = self.__keep_alive(asgi_scope)
+                # tell the client whether the connection stays open, HTTP/1.0 clients
+                # only keep it open when the server confirms keep-alive
+                if not keep_alive:
+                    connection = b'close'
+                elif asgi_scope['http_version'] == 'HTTP/1.0':
+                    connection = b'keep-alive'
+                else:
+                    connection = None
+                # send scope to app and get response
+                try:
+                    # only the app call is limited, writing the response never holds a slot,
+                    # so a client that stops reading cannot starve the others
+                    if self.app_semaphore is None:
+                        response: Dict[str, Any] = await self.app(asgi_scope)
+                    else:
+                        async with self.app_semaphore:
+                            response = await self.app(asgi_scope)
+                    server_logger.debug(f"web server response {response}")
+                    await http_handler.send_http_response(**response, connection=connection)
+                except Exception as e:
+                    server_logger.error(e)
+                    await http_handler.send_http_response(status_code=500, reason_phrase="Something went wrong!", connection=b'close')
+                    break
+                if not keep_alive:
+                    break
+        except ConnectionError as e:
+            server_logger.info(f"client {addr} connection lost: {e}")
+        finally:
+            # the connection is closed only once, when we are done serving it
+            if idle_timer is not None:
+                idle_timer.cancel()
+            server_logger.info(f"client {addr} disconnected")
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    def __keep_alive(scope: Dict[str, Any]) -> bool:
+        """
+        HTTP/1.1 connections are persistent unless the client sends Connection: close,
+        HTTP/1.0 connections are closed unless the client sends Connection: keep-alive.
+        """
+        connection = b''
+        for key, value in scope['headers']:
+            if key == b'connection':
+                connection = value.strip().lower()
+                break
+        if scope['http_version'] == 'HTTP/1.0':
+            return connection == b'keep-alive'
+        return connection != b'close'
+
 
 class HttpHandler:
     def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
@@ -48,41 +111,55 @@ class HttpHandler:
     
     async def parse_http_request(self, max_body_size: int) -> Dict[str, Any]:
         try:
-            # read the first line of the request
-            request_line: bytes = await self.reader.readline()
-            if not request_line:
-                await self.send_http_response(status_code=400, reason_phrase="Bad Request")
-                return
-            method, path, http_version = request_line.decode().strip().split(' ', 2)
+            # read the request line and all headers up to the empty line in one go
+            try:
+                header_block: bytes = await self.reader.readuntil(b'\r\n\r\n')
+            except asyncio.IncompleteReadError as e:
+                if not e.partial:
+                    # client closed the connection, nothing left to answer
+                    return
+                raise
+            # one split over the whole block, the block always ends with two empty lines
+            lines = header_block.split(b'\r\n')
+            method, path, http_version = lines[0].decode().split(' ', 2)
+            method = _METHODS.get(method, method)
 
-            # read headers until an empty line is encountered
-            headers = {}
-            while True:
-                line = await self.reader.readline()
-                if not line or line == b'\r\n':
-                    break
-                key, value = line.decode().strip().split(':', 1)
-                headers[key.lower()] = value.strip()
+            # headers are kept as bytes, names lowercased for lookup
+            headers: Dict[bytes, bytes] = {}
+            for line in lines[1:-2]:
+                key, separator, value = line.partition(b':')
+                if not separator:
+                    raise ValueError(f"malformed header line: {line!r}")
+                headers[key.strip().translate(_LOWERCASE_TABLE)] = value.strip()
+
+            # chunked and other transfer codings are not supported, their body would stay in
+            # the stream and be read as the next request, so answer and close the connection
+            if b'transfer-encoding' in headers:
+                await self.send_http_response(status_code=501, reason_phrase="Not Implemented", connection=b'close')
+                return
 
             # read body if Content-Length header is present
             body = b''
-            if 'content-length' in headers:
-                content_length = int(headers['content-length'])
+            if b'content-length' in headers:
+                content_length = int(headers[b'content-length'])
                 # safety check: prevent reading excessively large bodies based on Content-Length header
                 if content_length > max_body_size:
-                    await self.send_http_response(status_code=400, reason_phrase="Bad Request")
+                    await self.send_http_response(status_code=400, reason_phrase="Bad Request", connection=b'close')
                     return
                 body = await self.reader.readexactly(content_length)
 
+            # request targets are origin-form (path?query), so a partition is enough
+            raw_path, _, query = path.partition('?')
+
             # construct a basic ASGI scope dictionary
             # this is a simplified version of a real ASGI scope
             scope = {
                 'type': 'http',
                 'http_version': http_version,
                 'method': method,
-                'path': urlparse(path).path,
-                'query_string': urlparse(path).query.encode(),
-                'headers': [(k.encode(), v.encode()) for k, v in headers.items()],
+                'path': raw_path,
+                'query_string': query.encode(),
+                'headers': list(headers.items()),
                 'raw_path': path.encode(),
                 'body': body
             }
@@ -90,31 +167,30 @@ class HttpHandler:
         
         except Exception as e:
             server_logger.error(e)
-            await self.send_http_response(status_code=400, reason_phrase="Bad Request")
+            await self.send_http_response(status_code=400, reason_phrase="Bad Request", connection=b'close')
             return
     
-    async def send_http_response(self, status_code: int = 200, reason_phrase: str = "OK", headers: Dict[str, Any] = None, body: str ="") -> None:
+    async def send_http_response(self, status_code: int = 200, reason_phrase: str = "OK", headers: Dict[str, Any] = None, body: bytes = b"", connection: bytes = None) -> None:
         # default headers if none are provided
         if headers is None:
             headers = {
-                "Content-Type": "text/plain",
-                "Content-Length": str(len(body.encode("utf-8")))
+                "Content-Type": b"text/plain",
+                "Content-Length": str(len(body)).encode()
             }
 
-        # start with status line
-        response_lines: List[str] = [f"HTTP/1.1 {status_code} {reason_phrase}"]
-        # add headers
-        for key, value in headers.items():
-            response_lines.append(f"{key}: {value}")
-
-        # add empty line to separate headers from body
-        response_lines.append("")
-        # add body
-        response_lines.append(body.decode())
-        response_text = "\r\n".join(response_lines)
+        # build the status line and header block directly as bytes
+        status_line: bytes = f"HTTP/1.1 {status_code} {reason_phrase}\r\n".encode()
+        # header values are normally bytes already, anything else is encoded here
+        header_block: bytes = b"".join(
+            b"%s: %s\r\n" % (key.encode(), value if isinstance(value, bytes) else str(value).encode())
+            for key, value in headers.items()
+        )
+        # the Connection header is added here, the headers dict may be shared across responses
+        if connection is not None:
+            header_block += b"Connection: %s\r\n" % connection
 
-        self.writer.write(response_text.encode())
+        # hand the buffers to the transport as-is instead of concatenating them,
+        # the empty line separates headers from body
+        self.writer.writelines([status_line, header_block, b"\r\n", body])
         await self.writer.drain()
-        self.writer.close()
-        await self.writer.wait_closed()
         return